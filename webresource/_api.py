@@ -1,10 +1,13 @@
 from collections import Counter
+from heapq import heappop
+from heapq import heappush
 import base64
 import copy
 import hashlib
 import logging
 import os
 import sys
+import time
 import uuid
 
 
@@ -13,11 +16,51 @@ try:
 except NameError:  # pragma: nocover
     FileNotFoundError = EnvironmentError
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: nocover
+    ThreadPoolExecutor = None
+
+try:
+    from hashlib import file_digest
+except ImportError:  # pragma: nocover
+    file_digest = None
+
 
 logger = logging.getLogger(__name__)
 is_py3 = sys.version_info[0] >= 3
 namespace_uuid = uuid.UUID('f3341b2e-f97e-40d2-ad2f-10a08a778877')
 
+# File hashes by file path, modification time, size and hash algorithm.
+_file_hash_cache = dict()
+# Files modified less than this number of seconds ago might change again
+# without a noticeable change of modification time. Hashes of such files
+# are not cached.
+_file_hash_cache_delay = 2
+# Maximum number of cached file hashes. In development mode each change of a
+# file adds a new entry, the cache gets cleared if this limit is reached.
+_file_hash_cache_size = 4096
+
+# Sorted tag attribute names by tag attribute names as passed to renderer.
+_attr_order_cache = dict()
+# Maximum number of cached attribute orders. Additional attributes of
+# resources may change at runtime, the cache gets cleared if this limit is
+# reached.
+_attr_order_cache_size = 1024
+
+
+def _hash_file(path, hash_func):
+    """Return digest of file content without reading the whole file into
+    memory.
+    """
+    with open(path, 'rb') as f:
+        if file_digest is not None:  # pragma: nocover
+            return file_digest(f, hash_func).digest()
+        hash_ = hash_func()
+        for chunk in iter(lambda: f.read(65536), b''):
+            hash_.update(chunk)
+        return hash_.digest()
+
 
 class ResourceConfig(object):
     """Config singleton for web resources."""
@@ -36,6 +79,8 @@ class ResourceError(ValueError):
 class ResourceMixin(object):
     """Mixin for ``Resource`` and ``ResourceGroup``."""
 
+    __slots__ = ('name', '_directory', '_path', '_include', 'parent')
+
     def __init__(
         self, name='', directory=None, path=None, include=True, group=None
     ):
@@ -97,6 +142,12 @@ class ResourceMixin(object):
 class Resource(ResourceMixin):
     """A web resource."""
 
+    __slots__ = (
+        '_depends', 'resource', 'compressed', 'unique', 'unique_prefix',
+        'hash_algorithm', '_file_hash', '_unique_id', 'url', 'crossorigin',
+        'referrerpolicy', 'type_', 'additional_attrs'
+    )
+
     _hash_algorithms = dict(
         sha256=hashlib.sha256,
         sha384=hashlib.sha384,
@@ -133,30 +184,47 @@ class Resource(ResourceMixin):
         :param type_: Specifies the media type of the resource.
         :param **kwargs: Additional keyword arguments. Gets rendered as
             additional attributes on resource tag.
-        :raise ResourceError: No resource and no url given.
+        :raise ResourceError: No resource and no url given or unknown hash
+            algorithm.
         """
         if resource is None and url is None:
             raise ResourceError('Either resource or url must be given')
+        if hash_algorithm not in self._hash_algorithms:
+            raise ResourceError(
+                'Unknown hash algorithm: {}'.format(hash_algorithm)
+            )
         super(Resource, self).__init__(
             name=name, directory=directory, path=path,
             include=include, group=group
         )
-        self.depends = (
-            (depends if isinstance(depends, (list, tuple)) else [depends])
-            if depends else None
-        )
+        self.depends = depends
         self.resource = resource
         self.compressed = compressed
         self.unique = unique
         self.unique_prefix = unique_prefix
         self.hash_algorithm = hash_algorithm
-        self.file_hash = None
+        self._file_hash = None
+        self._unique_id = None
         self.url = url
         self.crossorigin = crossorigin
         self.referrerpolicy = referrerpolicy
         self.type_ = type_
         self.additional_attrs = kwargs
 
+    @property
+    def depends(self):
+        return self._depends
+
+    @depends.setter
+    def depends(self, depends):
+        # Dependencies are stored as tuple, thus they cannot be changed in
+        # place and go unnoticed by the resolver cache.
+        self._depends = (
+            (tuple(depends) if isinstance(depends, (list, tuple))
+             else (depends,))
+            if depends else None
+        )
+
     @property
     def file_name(self):
         """Resource file name depending on operation mode."""
@@ -183,9 +251,18 @@ class Resource(ResourceMixin):
         """Hash of resource file content."""
         if not config.development and self._file_hash is not None:
             return self._file_hash
-        hash_func = self._hash_algorithms[self.hash_algorithm]
-        hash_ = base64.b64encode(hash_func(self.file_data).digest())
-        hash_ = hash_.decode() if is_py3 else hash_
+        file_path = self.file_path
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime, stat.st_size, self.hash_algorithm)
+        hash_ = _file_hash_cache.get(key)
+        if hash_ is None:
+            hash_func = self._hash_algorithms[self.hash_algorithm]
+            hash_ = base64.b64encode(_hash_file(file_path, hash_func))
+            hash_ = hash_.decode('ascii') if is_py3 else hash_
+            if time.time() - stat.st_mtime > _file_hash_cache_delay:
+                if len(_file_hash_cache) >= _file_hash_cache_size:
+                    _file_hash_cache.clear()
+                _file_hash_cache[key] = hash_
         self.file_hash = hash_
         return hash_
 
@@ -193,12 +270,22 @@ class Resource(ResourceMixin):
     def file_hash(self, hash_):
         self._file_hash = hash_
 
+    @property
+    def _file_hash_required(self):
+        # Flag whether file hash is needed for rendering the resource.
+        return self.url is None and self.unique
+
     @property
     def unique_key(self):
-        return u'{}{}'.format(
-            self.unique_prefix,
-            str(uuid.uuid5(namespace_uuid, self.file_hash))
-        )
+        # UUID gets cached along with the file hash it was created from.
+        file_hash = self.file_hash
+        unique_id = self._unique_id
+        if unique_id is None or unique_id[0] != file_hash:
+            unique_id = self._unique_id = (
+                file_hash,
+                str(uuid.uuid5(namespace_uuid, file_hash))
+            )
+        return self.unique_prefix + unique_id[1]
 
     def resource_url(self, base_url):
         """Create URL for resource.
@@ -207,14 +294,13 @@ class Resource(ResourceMixin):
         """
         if self.url is not None:
             return self.url
-        parts = [base_url.strip('/')]
+        url = base_url.strip('/')
         path = self.path
         if path:
-            parts.append(path.strip('/'))
+            url += u'/' + path.strip('/')
         if self.unique:
-            parts.append(self.unique_key)
-        parts.append(self.file_name)
-        return u'/'.join(parts)
+            url += u'/' + self.unique_key
+        return url + u'/' + self.file_name
 
     def render(self, base_url):
         """Renders the resource HTML tag. must be implemented on subclass.
@@ -225,15 +311,24 @@ class Resource(ResourceMixin):
         raise NotImplementedError('Abstract resource not implements ``render``')
 
     def _render_tag(self, tag, closing_tag, **attrs):
+        names = tuple(attrs)
+        order = _attr_order_cache.get(names)
+        if order is None:
+            # Attributes are sorted as if sorting the rendered attributes.
+            order = tuple(sorted(names, key=lambda name: name + u'='))
+            if len(_attr_order_cache) >= _attr_order_cache_size:
+                _attr_order_cache.clear()
+            _attr_order_cache[names] = order
         attrs_ = list()
-        for name, val in attrs.items():
+        for name in order:
+            val = attrs[name]
             if val is None:
                 continue
-            attrs_.append(u'{0}="{1}"'.format(name, val))
-        attrs_ = u' {0}'.format(u' '.join(sorted(attrs_)))
+            attrs_.append(u'%s="%s"' % (name, val))
+        attrs_ = u' ' + u' '.join(attrs_)
         if not closing_tag:
-            return u'<{tag}{attrs} />'.format(tag=tag, attrs=attrs_)
-        return u'<{tag}{attrs}></{tag}>'.format(tag=tag, attrs=attrs_)
+            return u'<' + tag + attrs_ + u' />'
+        return u'<' + tag + attrs_ + u'></' + tag + u'>'
 
     def __repr__(self):
         return (
@@ -248,6 +343,10 @@ class Resource(ResourceMixin):
 class ScriptResource(Resource):
     """A Javascript resource."""
 
+    __slots__ = (
+        'async_', 'defer', '_integrity', '_integrity_hash', 'nomodule'
+    )
+
     def __init__(
         self, name='', depends=None, directory=None, path=None,
         resource=None, compressed=None, include=True, unique=False,
@@ -313,10 +412,7 @@ class ScriptResource(Resource):
         if not config.development and self._integrity_hash is not None:
             return self._integrity_hash
         if self._integrity is True:
-            self._integrity_hash = u'{}-{}'.format(
-                self.hash_algorithm,
-                self.file_hash
-            )
+            self._integrity_hash = self.hash_algorithm + u'-' + self.file_hash
         return self._integrity_hash
 
     @integrity.setter
@@ -330,6 +426,13 @@ class ScriptResource(Resource):
             self._integrity_hash = integrity
         self._integrity = integrity
 
+    @property
+    def _file_hash_required(self):
+        return (
+            super(ScriptResource, self)._file_hash_required
+            or self._integrity is True
+        )
+
     def render(self, base_url):
         """Renders the resource HTML ``script`` tag.
 
@@ -345,13 +448,16 @@ class ScriptResource(Resource):
             'integrity': self.integrity,
             'nomodule': self.nomodule
         }
-        attrs.update(self.additional_attrs)
+        if self.additional_attrs:
+            attrs.update(self.additional_attrs)
         return self._render_tag('script', True, **attrs)
 
 
 class LinkMixin(Resource):
     """Mixin class for link resources."""
 
+    __slots__ = ('hreflang', 'media', 'rel', 'sizes', 'title')
+
     def __init__(
         self, name='', depends=None, directory=None, path=None,
         resource=None, compressed=None, include=True, unique=False,
@@ -389,13 +495,16 @@ class LinkMixin(Resource):
             'sizes': self.sizes,
             'title': self.title
         }
-        attrs.update(self.additional_attrs)
+        if self.additional_attrs:
+            attrs.update(self.additional_attrs)
         return self._render_tag('link', False, **attrs)
 
 
 class LinkResource(LinkMixin):
     """A Link Resource."""
 
+    __slots__ = ()
+
     def __init__(
         self, name='', depends=None, directory=None, path=None,
         resource=None, compressed=None, include=True, unique=False,
@@ -452,6 +561,8 @@ class LinkResource(LinkMixin):
 class StyleResource(LinkMixin):
     """A Stylesheet Resource."""
 
+    __slots__ = ()
+
     def __init__(
         self, name='', depends=None, directory=None, path=None,
         resource=None, compressed=None, include=True, unique=False,
@@ -505,6 +616,8 @@ class StyleResource(LinkMixin):
 class ResourceGroup(ResourceMixin):
     """A resource group."""
 
+    __slots__ = ('_members',)
+
     def __init__(
         self, name='', directory=None, path=None, include=True, group=None
     ):
@@ -570,16 +683,11 @@ class ResourceGroup(ResourceMixin):
         member.parent = self
         self._members.append(member)
 
-    def _filtered_resources(self, type_, members=None):
-        if members is None:
-            members = self.members
+    def _filtered_resources(self, type_):
         resources = []
-        for member in members:
+        for member in self.members:
             if isinstance(member, ResourceGroup):
-                resources += self._filtered_resources(
-                    type_,
-                    members=member.members
-                )
+                resources += member._filtered_resources(type_)
             elif isinstance(member, type_):
                 resources.append(member)
         return resources
@@ -638,6 +746,7 @@ class ResourceResolver(object):
                     'of ``ResourceGroup`` or ``Resource``'
                 )
         self.members = members
+        self._resolved = None
 
     def _flat_resources(self, members=None):
         if members is None:
@@ -661,44 +770,80 @@ class ResourceResolver(object):
         :raise ResourceCircularDependencyError: Circular dependency defined.
         """
         resources = self._flat_resources()
+        # Resolved resources get cached. Since members, include flags, names
+        # and dependencies may change between calls, the flat resources with
+        # their names and dependencies are used as cache key.
+        key = [(res, res.name, res.depends) for res in resources]
+        if self._resolved is not None and self._resolved[0] == key:
+            return list(self._resolved[1])
         names = [res.name for res in resources]
-        counter = Counter(names)
-        if len(resources) != len(counter):
-            raise ResourceConflictError(counter)
-        ret = []
-        handled = {}
-        for resource in resources[:]:
+        if len(set(names)) != len(names):
+            raise ResourceConflictError(Counter(names))
+        # Resources are usually declared in dependency order. In this case the
+        # declaration order already is the resolved order.
+        seen = set()
+        for resource in resources:
+            if resource.depends and not seen.issuperset(resource.depends):
+                break
+            seen.add(resource.name)
+        else:
+            self._resolved = (key, resources)
+            return list(resources)
+        # Kahn's algorithm over resource positions. Resources ready for
+        # output are taken from a heap ordered by position, thus resources
+        # keep their declaration order as far as dependencies allow.
+        positions = {name: i for i, name in enumerate(names)}
+        indegrees = [0] * len(resources)
+        dependents = [[] for _ in resources]
+        for i, resource in enumerate(resources):
             if not resource.depends:
-                ret.append(resource)
-                handled[resource.name] = resource
-                resources.remove(resource)
+                continue
+            for dependency_name in resource.depends:
+                position = positions.get(dependency_name)
+                if position is None:
+                    raise ResourceMissingDependencyError(resource)
+                dependents[position].append(i)
+                indegrees[i] += 1
+        ready = [i for i, indegree in enumerate(indegrees) if not indegree]
+        ret = []
+        while ready:
+            i = heappop(ready)
+            ret.append(resources[i])
+            for dependent in dependents[i]:
+                indegrees[dependent] -= 1
+                if not indegrees[dependent]:
+                    heappush(ready, dependent)
+        if len(ret) != len(resources):
+            raise ResourceCircularDependencyError([
+                resource for i, resource in enumerate(resources)
+                if indegrees[i]
+            ])
+        self._resolved = (key, ret)
+        return list(ret)
+
+    def precompute_hashes(self, max_workers=None):
+        """Calculate file hashes of all resources requiring them.
+
+        File hashes are required for resources rendering a unique URL or an
+        integrity hash. Hashing is done concurrently in a thread pool. This is
+        useful at application startup to avoid hashing on first rendering.
+        The include flag of members is not considered.
+
+        :param max_workers: Optional maximum number of worker threads.
+        """
+        resources = []
+        for member in self.members:
+            if isinstance(member, ResourceGroup):
+                resources += member._filtered_resources(Resource)
             else:
-                for dependency_name in resource.depends:
-                    if dependency_name not in names:
-                        raise ResourceMissingDependencyError(resource)
-        count = len(resources)
-        while count > 0:
-            count -= 1
-            for resource in resources[:]:
-                hook_idx = 0
-                not_yet = False
-                for dependency_name in resource.depends:
-                    if dependency_name in handled:
-                        dependency = handled[dependency_name]
-                        dep_idx = ret.index(dependency)
-                        hook_idx = dep_idx if dep_idx > hook_idx else hook_idx
-                    else:
-                        not_yet = True
-                        break
-                if not_yet:
-                    continue
-                ret.insert(hook_idx + 1, resource)
-                handled[resource.name] = resource
-                resources.remove(resource)
-                break
-        if resources:
-            raise ResourceCircularDependencyError(resources)
-        return ret
+                resources.append(member)
+        resources = [res for res in resources if res._file_hash_required]
+        if ThreadPoolExecutor is None:  # pragma: nocover
+            for resource in resources:
+                resource.file_hash
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda res: res.file_hash, resources))
 
 
 class ResourceRenderer(object):
@@ -715,17 +860,23 @@ class ResourceRenderer(object):
 
     def render(self):
         """Render resources."""
-        return u'\n'.join([
-            res.render(self.base_url) for res in self.resolver.resolve()
-        ])
+        resources = self.resolver.resolve()
+        if not resources:
+            return u''
+        if len(resources) == 1:
+            return resources[0].render(self.base_url)
+        return u'\n'.join([res.render(self.base_url) for res in resources])
 
 
 class GracefulResourceRenderer(ResourceRenderer):
     """Resource renderer, which does not fail but logs an exception."""
 
     def render(self):
+        resources = self.resolver.resolve()
+        if not resources:
+            return u''
         lines = []
-        for resource in self.resolver.resolve():
+        for resource in resources:
             try:
                 lines.append(resource.render(self.base_url))
             except (ResourceError, FileNotFoundError):